@@ -1,4 +1,5 @@
 use std::collections::HashMap;
+use std::rc::Rc;
 use std::time::{SystemTime, UNIX_EPOCH};
 
 /// Variable type declarations
@@ -305,7 +306,7 @@ pub struct FunctionDefinition {
 pub struct ExecutionContext {
     pub variables: HashMap<String, VariableInfo>,
     pub arrays: HashMap<String, Vec<Value>>,
-    pub functions: HashMap<String, FunctionDefinition>,
+    pub functions: HashMap<String, Rc<FunctionDefinition>>, // Shared so calls never copy the body
     pub for_loops: Vec<ForLoop>,
     pub gosub_stack: Vec<usize>,
     pub data: Vec<Value>,
@@ -349,49 +350,70 @@ impl ExecutionContext {
         }
     }
 
-    /// Get the declared type for a variable, considering both declaration characters and DEF statements
-    pub fn get_variable_type(&self, name: &str) -> VariableType {
+    /// Resolve a variable name to its base name and declared type with a single parse
+    pub fn resolve_variable(&self, name: &str) -> (String, VariableType) {
         let (base_name, explicit_type) = Self::parse_variable_name(name);
 
         // Explicit type declaration character takes precedence
         if let Some(var_type) = explicit_type {
-            return var_type;
+            return (base_name, var_type);
         }
 
         // Check DEF statements for the first character
         if let Some(first_char) = base_name.chars().next() {
             let range_key = first_char.to_string();
             if let Some(def_type) = self.type_declarations.get(&range_key) {
-                return def_type.clone();
+                return (base_name, def_type.clone());
             }
         }
 
         // Default to Single (GW-BASIC default for undeclared variables)
-        VariableType::Single
+        (base_name, VariableType::Single)
+    }
+
+    /// Get the declared type for a variable, considering both declaration characters and DEF statements
+    pub fn get_variable_type(&self, name: &str) -> VariableType {
+        self.resolve_variable(name).1
+    }
+
+    /// Initial value of a variable that has not been assigned yet
+    pub fn default_value(var_type: &VariableType) -> Value {
+        match var_type {
+            VariableType::Integer => Value::Integer(0),
+            VariableType::Single => Value::Single(0.0),
+            VariableType::Double => Value::Double(0.0),
+            VariableType::String => Value::String(String::new()),
+        }
     }
 
     /// Get or create a variable with proper typing
     pub fn get_variable(&mut self, name: &str) -> &mut VariableInfo {
-        let var_type = self.get_variable_type(name);
-        let (base_name, _) = Self::parse_variable_name(name);
+        let (base_name, var_type) = self.resolve_variable(name);
 
         self.variables
             .entry(base_name)
             .or_insert_with(|| VariableInfo {
-                value: match var_type {
-                    VariableType::Integer => Value::Integer(0),
-                    VariableType::Single => Value::Single(0.0),
-                    VariableType::Double => Value::Double(0.0),
-                    VariableType::String => Value::String(String::new()),
-                },
+                value: Self::default_value(&var_type),
                 declared_type: var_type,
             })
     }
+
+    /// Read a variable's value without creating an entry for it
+    pub fn read_variable(&self, name: &str) -> Value {
+        let (base_name, var_type) = self.resolve_variable(name);
+
+        match self.variables.get(&base_name) {
+            Some(var_info) => var_info.value.clone(),
+            None => Self::default_value(&var_type),
+        }
+    }
 }
 
 #[derive(Debug, Clone)]
 pub struct ForLoop {
     pub variable: String,
+    pub base_name: String, // Resolved once at FOR so NEXT does not re-parse the name
+    pub var_type: VariableType,
     pub end_value: f64,
     pub step_value: f64,
     pub line_index: usize,
@@ -414,9 +436,23 @@ pub enum ExecutionResult {
     Error(String),
 }
 
+/// Turtle graphics operations, matched directly by the renderer
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub enum GraphicsOp {
+    Forward,
+    Back,
+    Left,
+    Right,
+    PenUp,
+    PenDown,
+    Home,
+    Setxy,
+    Turn,
+}
+
 #[derive(Debug, Clone)]
 pub struct GraphicsCommand {
-    pub command: String,
+    pub command: GraphicsOp,
     pub value: f32,
 }
 
@@ -1,15 +1,30 @@
 use crate::languages::basic::ast::{
     BinaryOperator, ExecutionContext, ExecutionResult, Expression, ForLoop, FunctionDefinition,
-    GraphicsCommand, InterpreterError, PrintSeparator, Program, Statement, UnaryOperator, Value,
-    VariableType,
+    GraphicsCommand, GraphicsOp, InterpreterError, PrintSeparator, Program, Statement,
+    UnaryOperator, Value, VariableInfo, VariableType,
 };
 use std::collections::HashMap;
+use std::fmt::Write;
+use std::rc::Rc;
 use std::time::{SystemTime, UNIX_EPOCH};
 
+/// Control flow requested by a statement, handled by the run loop
+#[derive(Debug, Clone, PartialEq)]
+enum Flow {
+    /// Continue at the statement with this index
+    Goto(usize),
+    /// NEXT has already moved execution back to the loop body
+    ContinueLoop,
+    /// Waiting for INPUT with this prompt
+    Input(String),
+    End,
+    Stop,
+}
+
 /// BASIC interpreter engine
 pub struct Interpreter {
     context: ExecutionContext,
-    program: Option<Program>,
+    program: Option<Rc<Program>>,
     current_line: usize,
     instruction_count: usize,
     pub max_instructions: usize,
@@ -37,7 +52,7 @@ impl Interpreter {
         let mut parser = crate::languages::basic::parser::Parser::new(tokens);
         let program = parser.parse_program()?;
 
-        self.program = Some(program);
+        self.program = Some(Rc::new(program));
         self.execute_program()
     }
 
@@ -56,18 +71,24 @@ impl Interpreter {
     }
 
     fn execute_program(&mut self) -> Result<ExecutionResult, InterpreterError> {
-        let mut output = String::new();
-        let mut graphics_commands = Vec::new();
-
-        // Extract statements to avoid borrowing conflicts
-        let statements = if let Some(ref program) = self.program {
-            program.statements.clone()
+        // Share the parsed program for the duration of the run so the statements
+        // can be borrowed while executing, instead of cloning the whole AST each time
+        let program = if let Some(ref program) = self.program {
+            Rc::clone(program)
         } else {
             return Err(InterpreterError::RuntimeError(
                 "No program loaded".to_string(),
             ));
         };
 
+        self.run_program(&program)
+    }
+
+    fn run_program(&mut self, program: &Program) -> Result<ExecutionResult, InterpreterError> {
+        let mut output = String::new();
+        let mut graphics_commands = Vec::new();
+        let statements = &program.statements;
+
         while self.current_line < statements.len() {
             self.instruction_count += 1;
             if self.instruction_count > self.max_instructions {
@@ -81,24 +102,16 @@ impl Interpreter {
             let result = self.execute_statement(statement, &mut output, &mut graphics_commands)?;
 
             match result {
-                Some(special_result) => {
-                    if special_result == "END" {
-                        break;
-                    } else if special_result == "STOP" {
-                        break;
-                    } else if special_result.starts_with("GOTO ") {
-                        if let Ok(line_num) = special_result[5..].parse::<usize>() {
-                            if line_num < statements.len() {
-                                self.current_line = line_num;
-                                continue;
-                            }
-                        }
-                    } else if special_result == "CONTINUE_LOOP" {
-                        // NEXT statement handled the line adjustment
-                        continue;
-                    }
+                Some(Flow::End) | Some(Flow::Stop) => break,
+                Some(Flow::Goto(line_num)) if line_num < statements.len() => {
+                    self.current_line = line_num;
+                    continue;
+                }
+                Some(Flow::ContinueLoop) => {
+                    // NEXT statement handled the line adjustment
+                    continue;
                 }
-                None => {}
+                _ => {}
             }
 
             self.current_line += 1;
@@ -115,18 +128,14 @@ impl Interpreter {
         statement: &Statement,
         output: &mut String,
         graphics_commands: &mut Vec<GraphicsCommand>,
-    ) -> Result<Option<String>, InterpreterError> {
+    ) -> Result<Option<Flow>, InterpreterError> {
         match statement {
             Statement::Let {
                 variable,
                 expression,
             } => {
                 let value = self.evaluate_expression(expression)?;
-                let var_type = self.context.get_variable_type(variable);
-                let converted_value = self.convert_value_to_variable_type(&value, variable)?;
-                let var_info = self.context.get_variable(variable);
-                var_info.value = converted_value;
-                var_info.declared_type = var_type;
+                self.assign_variable(variable, &value)?;
                 Ok(None)
             }
             Statement::Print {
@@ -134,9 +143,13 @@ impl Interpreter {
                 separators,
             } => {
                 for (i, expr) in expressions.iter().enumerate() {
-                    let value = self.evaluate_expression(expr)?;
-                    let value_str = self.value_to_string(&value);
-                    output.push_str(&value_str);
+                    // String literals are copied straight into the output buffer
+                    if let Expression::String(s) = expr {
+                        output.push_str(s);
+                    } else {
+                        let value = self.evaluate_expression(expr)?;
+                        self.write_value(output, &value);
+                    }
 
                     // Add separator if not the last expression
                     if i < separators.len() {
@@ -159,7 +172,7 @@ impl Interpreter {
             Statement::Input { prompt, variable } => {
                 self.context.input_variable = Some(variable.clone());
                 let prompt_text = prompt.as_ref().unwrap_or(&"? ".to_string()).clone();
-                Ok(Some(format!("INPUT {}", prompt_text)))
+                Ok(Some(Flow::Input(prompt_text)))
             }
             Statement::If {
                 condition,
@@ -195,16 +208,22 @@ impl Interpreter {
                 let step_num = self.value_to_number(&step_value)?;
 
                 // Initialize loop variable
-                let var_type = self.context.get_variable_type(variable);
-                let converted_start = self
-                    .convert_value_to_variable_type(&Value::Single(start_num as f32), variable)?;
-                let var_info = self.context.get_variable(variable);
-                var_info.value = converted_start;
-                var_info.declared_type = var_type;
+                let (base_name, var_type) = self.context.resolve_variable(variable);
+                let converted_start =
+                    self.convert_value_to_type(&Value::Single(start_num as f32), &var_type)?;
+                self.context.variables.insert(
+                    base_name.clone(),
+                    VariableInfo {
+                        value: converted_start,
+                        declared_type: var_type.clone(),
+                    },
+                );
 
                 // Push loop context
                 self.context.for_loops.push(ForLoop {
                     variable: variable.clone(),
+                    base_name,
+                    var_type,
                     end_value: end_num,
                     step_value: step_num,
                     line_index: self.current_line,
@@ -217,25 +236,25 @@ impl Interpreter {
             Statement::Goto { line } => {
                 let line_value = self.evaluate_expression(line)?;
                 let line_num = self.value_to_number(&line_value)? as usize;
-                Ok(Some(format!("GOTO {}", line_num)))
+                Ok(Some(Flow::Goto(self.resolve_line_number(line_num))))
             }
             Statement::Gosub { line } => {
                 let line_value = self.evaluate_expression(line)?;
                 let line_num = self.value_to_number(&line_value)? as usize;
                 self.context.gosub_stack.push(self.current_line);
-                Ok(Some(format!("GOTO {}", line_num)))
+                Ok(Some(Flow::Goto(self.resolve_line_number(line_num))))
             }
             Statement::Return => {
                 if let Some(return_line) = self.context.gosub_stack.pop() {
-                    Ok(Some(format!("GOTO {}", return_line + 1)))
+                    Ok(Some(Flow::Goto(return_line + 1)))
                 } else {
                     Err(InterpreterError::RuntimeError(
                         "RETURN without GOSUB".to_string(),
                     ))
                 }
             }
-            Statement::End => Ok(Some("END".to_string())),
-            Statement::Stop => Ok(Some("STOP".to_string())),
+            Statement::End => Ok(Some(Flow::End)),
+            Statement::Stop => Ok(Some(Flow::Stop)),
             Statement::Rem(_) => Ok(None), // Comments do nothing
             Statement::Dim { arrays } => {
                 for (name, dimensions) in arrays {
@@ -250,10 +269,10 @@ impl Interpreter {
             } => {
                 self.context.functions.insert(
                     name.clone(),
-                    FunctionDefinition {
+                    Rc::new(FunctionDefinition {
                         parameters: parameters.clone(),
                         body: body.clone(),
-                    },
+                    }),
                 );
                 Ok(None)
             }
@@ -265,15 +284,13 @@ impl Interpreter {
             }
             Statement::Writeln { expression } => {
                 let value = self.evaluate_expression(expression)?;
-                let value_str = self.value_to_string(&value);
-                output.push_str(&value_str);
+                self.write_value(output, &value);
                 output.push('\n');
                 Ok(None)
             }
             Statement::Printx { expression } => {
                 let value = self.evaluate_expression(expression)?;
-                let value_str = self.value_to_string(&value);
-                output.push_str(&value_str);
+                self.write_value(output, &value);
                 Ok(None)
             }
             Statement::DefInt { ranges } => {
@@ -323,45 +340,45 @@ impl Interpreter {
                 let dist = self.evaluate_expression(distance)?;
                 let dist_num = self.value_to_number(&dist)?;
                 graphics_commands.push(GraphicsCommand {
-                    command: "FORWARD".to_string(),
+                    command: GraphicsOp::Forward,
                     value: dist_num as f32,
                 });
-                output.push_str(&format!("Moved forward {}\n", dist_num));
+                let _ = writeln!(output, "Moved forward {}", dist_num);
                 Ok(None)
             }
             Statement::Back { distance } => {
                 let dist = self.evaluate_expression(distance)?;
                 let dist_num = self.value_to_number(&dist)?;
                 graphics_commands.push(GraphicsCommand {
-                    command: "BACK".to_string(),
+                    command: GraphicsOp::Back,
                     value: dist_num as f32,
                 });
-                output.push_str(&format!("Moved back {}\n", dist_num));
+                let _ = writeln!(output, "Moved back {}", dist_num);
                 Ok(None)
             }
             Statement::TurnLeft { angle } => {
                 let ang = self.evaluate_expression(angle)?;
                 let ang_num = self.value_to_number(&ang)?;
                 graphics_commands.push(GraphicsCommand {
-                    command: "LEFT".to_string(),
+                    command: GraphicsOp::Left,
                     value: ang_num as f32,
                 });
-                output.push_str(&format!("Turned left by {} degrees\n", ang_num));
+                let _ = writeln!(output, "Turned left by {} degrees", ang_num);
                 Ok(None)
             }
             Statement::TurnRight { angle } => {
                 let ang = self.evaluate_expression(angle)?;
                 let ang_num = self.value_to_number(&ang)?;
                 graphics_commands.push(GraphicsCommand {
-                    command: "RIGHT".to_string(),
+                    command: GraphicsOp::Right,
                     value: ang_num as f32,
                 });
-                output.push_str(&format!("Turned right {}\n", ang_num));
+                let _ = writeln!(output, "Turned right {}", ang_num);
                 Ok(None)
             }
             Statement::Penup => {
                 graphics_commands.push(GraphicsCommand {
-                    command: "PENUP".to_string(),
+                    command: GraphicsOp::PenUp,
                     value: 0.0,
                 });
                 output.push_str("Pen up\n");
@@ -369,7 +386,7 @@ impl Interpreter {
             }
             Statement::Pendown => {
                 graphics_commands.push(GraphicsCommand {
-                    command: "PENDOWN".to_string(),
+                    command: GraphicsOp::PenDown,
                     value: 0.0,
                 });
                 output.push_str("Pen down\n");
@@ -377,7 +394,7 @@ impl Interpreter {
             }
             Statement::Home => {
                 graphics_commands.push(GraphicsCommand {
-                    command: "HOME".to_string(),
+                    command: GraphicsOp::Home,
                     value: 0.0,
                 });
                 output.push_str("Moved to home position\n");
@@ -391,25 +408,36 @@ impl Interpreter {
                 // For SETXY, we might need to store both values somehow
                 // For now, just store x and handle y separately if needed
                 graphics_commands.push(GraphicsCommand {
-                    command: "SETXY".to_string(),
+                    command: GraphicsOp::Setxy,
                     value: x_num as f32,
                 });
-                output.push_str(&format!("Moved to ({}, {})\n", x_num, y_num));
+                let _ = writeln!(output, "Moved to ({}, {})", x_num, y_num);
                 Ok(None)
             }
             Statement::Turn { angle } => {
                 let ang = self.evaluate_expression(angle)?;
                 let ang_num = self.value_to_number(&ang)?;
                 graphics_commands.push(GraphicsCommand {
-                    command: "TURN".to_string(),
+                    command: GraphicsOp::Turn,
                     value: ang_num as f32,
                 });
-                output.push_str(&format!("Turned by {} degrees\n", ang_num));
+                let _ = writeln!(output, "Turned by {} degrees", ang_num);
                 Ok(None)
             }
         }
     }
 
+    /// Map a BASIC line number to its statement index using the table built by the
+    /// parser. Targets without a numbered line are treated as statement indices,
+    /// which is how unnumbered programs address their statements.
+    fn resolve_line_number(&self, line_num: usize) -> usize {
+        self.program
+            .as_ref()
+            .and_then(|program| program.line_numbers.get(&line_num))
+            .copied()
+            .unwrap_or(line_num)
+    }
+
     fn execute_statement_block(
         &mut self,
         statements: &[Statement],
@@ -425,62 +453,66 @@ impl Interpreter {
     fn handle_next_statement(
         &mut self,
         variable: &Option<String>,
-    ) -> Result<Option<String>, InterpreterError> {
-        if let Some(for_loop) = self.context.for_loops.last() {
-            let loop_var = for_loop.variable.clone();
-            let loop_end = for_loop.end_value;
-            let loop_step = for_loop.step_value;
-
-            // Check if variable matches (if specified)
-            if let Some(var_name) = variable {
-                if *var_name != loop_var {
-                    return Err(InterpreterError::RuntimeError(format!(
-                        "NEXT {} does not match FOR {}",
-                        var_name, loop_var
-                    )));
-                }
-            }
+    ) -> Result<Option<Flow>, InterpreterError> {
+        let for_loop = if let Some(for_loop) = self.context.for_loops.last() {
+            for_loop
+        } else {
+            return Err(InterpreterError::RuntimeError(
+                "NEXT without FOR".to_string(),
+            ));
+        };
+        let loop_end = for_loop.end_value;
+        let loop_step = for_loop.step_value;
+        let body_start = for_loop.body_start;
 
-            // Get current value
-            let var_info = self.context.get_variable(&loop_var);
-            let current_value = var_info.value.clone();
-            let current_num = self.value_to_number(&current_value)?;
+        // Check if variable matches (if specified)
+        if let Some(var_name) = variable {
+            if *var_name != for_loop.variable {
+                return Err(InterpreterError::RuntimeError(format!(
+                    "NEXT {} does not match FOR {}",
+                    var_name, for_loop.variable
+                )));
+            }
+        }
 
-            // Increment
-            let new_value = current_num + loop_step;
-            let var_type = self.context.get_variable_type(&loop_var);
-            let converted_value =
-                self.convert_value_to_variable_type(&Value::Single(new_value as f32), &loop_var)?;
-            let var_info_mut = self.context.get_variable(&loop_var);
-            var_info_mut.value = converted_value;
-            var_info_mut.declared_type = var_type;
+        // The loop variable was resolved at FOR, so read and update its entry in place
+        let current_num = match self.context.variables.get(&for_loop.base_name) {
+            Some(var_info) => self.value_to_number(&var_info.value)?,
+            None => 0.0,
+        };
 
-            // Check if loop should continue
-            let should_continue = if loop_step >= 0.0 {
-                new_value <= loop_end
-            } else {
-                new_value >= loop_end
-            };
-
-            if should_continue {
-                // Continue loop - jump back to the first statement after FOR
-                if let Some(for_loop) = self.context.for_loops.last() {
-                    self.current_line = for_loop.body_start;
-                    Ok(Some("CONTINUE_LOOP".to_string()))
-                } else {
-                    Err(InterpreterError::RuntimeError(
-                        "FOR loop state corrupted".to_string(),
-                    ))
-                }
-            } else {
-                // Exit loop
-                self.context.for_loops.pop();
-                Ok(None)
+        // Increment
+        let new_value = current_num + loop_step;
+        let converted_value =
+            self.convert_value_to_type(&Value::Single(new_value as f32), &for_loop.var_type)?;
+        match self.context.variables.get_mut(&for_loop.base_name) {
+            Some(var_info) => var_info.value = converted_value,
+            None => {
+                self.context.variables.insert(
+                    for_loop.base_name.clone(),
+                    VariableInfo {
+                        value: converted_value,
+                        declared_type: for_loop.var_type.clone(),
+                    },
+                );
             }
+        }
+
+        // Check if loop should continue
+        let should_continue = if loop_step >= 0.0 {
+            new_value <= loop_end
         } else {
-            Err(InterpreterError::RuntimeError(
-                "NEXT without FOR".to_string(),
-            ))
+            new_value >= loop_end
+        };
+
+        if should_continue {
+            // Continue loop - jump back to the first statement after FOR
+            self.current_line = body_start;
+            Ok(Some(Flow::ContinueLoop))
+        } else {
+            // Exit loop
+            self.context.for_loops.pop();
+            Ok(None)
         }
     }
 
@@ -489,8 +521,8 @@ impl Interpreter {
             Expression::Number(n) => Ok(Value::Number(*n)),
             Expression::String(s) => Ok(Value::String(s.clone())),
             Expression::Variable(name) => {
-                let var_info = self.context.get_variable(name);
-                Ok(var_info.value.clone())
+                // Reads never need to create the variable, so look it up without inserting
+                Ok(self.context.read_variable(name))
             }
             Expression::BinaryOp {
                 left,
@@ -621,7 +653,8 @@ impl Interpreter {
         name: &str,
         arguments: &[Value],
     ) -> Result<Value, InterpreterError> {
-        match name.to_uppercase().as_str() {
+        // Function names are uppercased by the tokenizer
+        match name {
             "SIN" => self.math_function(arguments, |x| x.sin()),
             "COS" => self.math_function(arguments, |x| x.cos()),
             "TAN" => self.math_function(arguments, |x| x.tan()),
@@ -731,18 +764,17 @@ impl Interpreter {
                             }
                         }
                         Value::Number(index) => {
-                            // Get environment variable by index (1-based)
+                            // Get environment variable by index (1-based), walking the
+                            // environment only as far as needed instead of collecting it
                             let index = *index as usize;
-                            if index > 0 {
-                                let env_vars: Vec<_> = std::env::vars().collect();
-                                if index <= env_vars.len() {
-                                    let (key, value) = &env_vars[index - 1];
+                            let entry = index
+                                .checked_sub(1)
+                                .and_then(|position| std::env::vars().nth(position));
+                            match entry {
+                                Some((key, value)) => {
                                     Ok(Value::String(format!("{}={}", key, value)))
-                                } else {
-                                    Ok(Value::String(String::new()))
                                 }
-                            } else {
-                                Ok(Value::String(String::new()))
+                                None => Ok(Value::String(String::new())),
                             }
                         }
                         _ => Err(InterpreterError::TypeError(
@@ -762,7 +794,7 @@ impl Interpreter {
                 } else {
                     name
                 };
-                if let Some(func_def) = self.context.functions.get(lookup_name).cloned() {
+                if let Some(func_def) = self.context.functions.get(lookup_name).map(Rc::clone) {
                     self.call_user_function(&func_def, arguments)
                 } else {
                     Err(InterpreterError::UndefinedFunction(name.to_string()))
@@ -808,11 +840,7 @@ impl Interpreter {
 
         // Set parameter values (parameters are treated as Single by default in GW-BASIC)
         for (param, arg) in func_def.parameters.iter().zip(arguments) {
-            let var_type = self.context.get_variable_type(param);
-            let converted_arg = self.convert_value_to_variable_type(&arg, param)?;
-            let var_info = self.context.get_variable(param);
-            var_info.value = converted_arg;
-            var_info.declared_type = var_type;
+            self.assign_variable(param, arg)?;
         }
 
         // Evaluate function body
@@ -841,10 +869,8 @@ impl Interpreter {
         let size_value = self.evaluate_expression(size_expr)?;
         let size = self.value_to_number(&size_value)? as usize;
 
-        let mut array = Vec::with_capacity(size + 1); // +1 for 0-based indexing
-        for _ in 0..=size {
-            array.push(Value::Number(0.0));
-        }
+        // Single contiguous allocation, +1 for 0-based indexing
+        let array = vec![Value::Number(0.0); size + 1];
 
         self.context.arrays.insert(name.to_string(), array);
         Ok(())
@@ -889,14 +915,19 @@ impl Interpreter {
         }
     }
 
-    fn value_to_string(&self, value: &Value) -> String {
-        match value {
-            Value::Number(n) => n.to_string(),
-            Value::Integer(i) => i.to_string(),
-            Value::Single(s) => s.to_string(),
-            Value::Double(d) => d.to_string(),
-            Value::String(s) => s.clone(),
-        }
+    /// Append a value's printed form to the output buffer without an intermediate String
+    fn write_value(&self, output: &mut String, value: &Value) {
+        // Writing into a String cannot fail
+        let _ = match value {
+            Value::Number(n) => write!(output, "{}", n),
+            Value::Integer(i) => write!(output, "{}", i),
+            Value::Single(s) => write!(output, "{}", s),
+            Value::Double(d) => write!(output, "{}", d),
+            Value::String(s) => {
+                output.push_str(s);
+                Ok(())
+            }
+        };
     }
 
     fn value_to_bool(&self, value: &Value) -> Result<bool, InterpreterError> {
@@ -935,11 +966,7 @@ impl Interpreter {
 
         // Set the input variable if one is expected
         if let Some(ref var_name) = self.context.input_variable.clone() {
-            let var_type = self.context.get_variable_type(&var_name);
-            let converted_value = self.convert_value_to_variable_type(&parsed_value, &var_name)?;
-            let var_info = self.context.get_variable(&var_name);
-            var_info.value = converted_value;
-            var_info.declared_type = var_type;
+            self.assign_variable(var_name, &parsed_value)?;
             self.context.input_variable = None;
         }
 
@@ -984,14 +1011,27 @@ impl Interpreter {
         Ok(())
     }
 
+    /// Convert a value and store it in a variable, resolving the variable's name and
+    /// type only once
+    fn assign_variable(&mut self, name: &str, value: &Value) -> Result<(), InterpreterError> {
+        let (base_name, var_type) = self.context.resolve_variable(name);
+        let converted_value = self.convert_value_to_type(value, &var_type)?;
+        self.context.variables.insert(
+            base_name,
+            VariableInfo {
+                value: converted_value,
+                declared_type: var_type,
+            },
+        );
+        Ok(())
+    }
+
     /// Convert a value to the appropriate type for a variable
-    fn convert_value_to_variable_type(
+    fn convert_value_to_type(
         &self,
         value: &Value,
-        variable_name: &str,
+        target_type: &VariableType,
     ) -> Result<Value, InterpreterError> {
-        let target_type = self.context.get_variable_type(variable_name);
-
         match (value, target_type) {
             // Legacy Number type support
             (Value::Number(n), VariableType::Integer) => Ok(Value::Integer(*n as i32)),
@@ -5,8 +5,8 @@ pub mod tokenizer;
 
 // Re-export main types for convenience
 pub use ast::{
-    ExecutionResult, Expression, GraphicsCommand, InterpreterError, Program, Statement, Token,
-    Value,
+    ExecutionResult, Expression, GraphicsCommand, GraphicsOp, InterpreterError, Program, Statement,
+    Token, Value,
 };
 pub use interpreter::Interpreter;
 pub use parser::Parser;
@@ -378,11 +378,7 @@ impl Parser {
         while self.match_token(&[Token::Or]) {
             let operator = BinaryOperator::Or;
             let right = self.parse_logical_and()?;
-            expr = Expression::BinaryOp {
-                left: Box::new(expr),
-                operator,
-                right: Box::new(right),
-            };
+            expr = Self::binary_expression(expr, operator, right);
         }
 
         Ok(expr)
@@ -394,11 +390,7 @@ impl Parser {
         while self.match_token(&[Token::And]) {
             let operator = BinaryOperator::And;
             let right = self.parse_comparison()?;
-            expr = Expression::BinaryOp {
-                left: Box::new(expr),
-                operator,
-                right: Box::new(right),
-            };
+            expr = Self::binary_expression(expr, operator, right);
         }
 
         Ok(expr)
@@ -425,11 +417,7 @@ impl Parser {
                 _ => unreachable!(),
             };
             let right = self.parse_term()?;
-            expr = Expression::BinaryOp {
-                left: Box::new(expr),
-                operator,
-                right: Box::new(right),
-            };
+            expr = Self::binary_expression(expr, operator, right);
         }
 
         Ok(expr)
@@ -445,11 +433,7 @@ impl Parser {
                 _ => unreachable!(),
             };
             let right = self.parse_factor()?;
-            expr = Expression::BinaryOp {
-                left: Box::new(expr),
-                operator,
-                right: Box::new(right),
-            };
+            expr = Self::binary_expression(expr, operator, right);
         }
 
         Ok(expr)
@@ -466,11 +450,7 @@ impl Parser {
                 _ => unreachable!(),
             };
             let right = self.parse_power()?;
-            expr = Expression::BinaryOp {
-                left: Box::new(expr),
-                operator,
-                right: Box::new(right),
-            };
+            expr = Self::binary_expression(expr, operator, right);
         }
 
         Ok(expr)
@@ -481,11 +461,7 @@ impl Parser {
 
         if self.match_token(&[Token::Power]) {
             let right = self.parse_power()?;
-            expr = Expression::BinaryOp {
-                left: Box::new(expr),
-                operator: BinaryOperator::Power,
-                right: Box::new(right),
-            };
+            expr = Self::binary_expression(expr, BinaryOperator::Power, right);
         }
 
         Ok(expr)
@@ -499,6 +475,10 @@ impl Parser {
                 _ => unreachable!(),
             };
             let operand = self.parse_unary()?;
+            // Fold negated numeric literals so they evaluate as plain constants
+            if let (UnaryOperator::Negate, Expression::Number(n)) = (operator, &operand) {
+                return Ok(Expression::Number(-n));
+            }
             Ok(Expression::UnaryOp {
                 operator,
                 operand: Box::new(operand),
@@ -611,7 +591,7 @@ impl Parser {
                 let is_function = self.check(&[Token::LParen])
                     || ident.ends_with('$')
                     || matches!(
-                        ident.to_uppercase().as_str(),
+                        ident.as_str(),
                         "TAB"
                             | "SPC"
                             | "SIN"
@@ -671,6 +651,36 @@ impl Parser {
         }
     }
 
+    /// Build a binary expression node, folding it into a single literal when both
+    /// operands are numeric constants so the work is done once at parse time
+    fn binary_expression(
+        left: Expression,
+        operator: BinaryOperator,
+        right: Expression,
+    ) -> Expression {
+        if let (Expression::Number(l), Expression::Number(r)) = (&left, &right) {
+            let folded = match operator {
+                BinaryOperator::Add => Some(l + r),
+                BinaryOperator::Subtract => Some(l - r),
+                BinaryOperator::Multiply => Some(l * r),
+                // Division by zero is left for the interpreter to report at runtime
+                BinaryOperator::Divide if *r != 0.0 => Some(l / r),
+                BinaryOperator::Modulo => Some(l % r),
+                BinaryOperator::Power => Some(l.powf(*r)),
+                _ => None,
+            };
+            if let Some(value) = folded {
+                return Expression::Number(value);
+            }
+        }
+
+        Expression::BinaryOp {
+            left: Box::new(left),
+            operator,
+            right: Box::new(right),
+        }
+    }
+
     fn parse_identifier(&mut self) -> Result<String, InterpreterError> {
         if let Some(Token::Identifier(id)) = self.current_token().cloned() {
             self.advance();
@@ -193,11 +193,13 @@ impl Tokenizer {
             self.advance();
         }
 
+        // BASIC is case-insensitive, so identifiers are normalized to uppercase once here
+        // and later stages can compare names without converting them again
         let identifier: String = self.input[start..self.position].iter().collect();
-        let upper_identifier = identifier.to_uppercase();
+        let identifier = identifier.to_uppercase();
 
         // Check for keywords
-        let token = match upper_identifier.as_str() {
+        let token = match identifier.as_str() {
             "LET" => Token::Let,
             "PRINT" => Token::Print,
             "INPUT" => Token::Input,
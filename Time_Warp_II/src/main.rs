@@ -4,6 +4,122 @@ use std::collections::HashMap;
 
 mod languages;
 
+/// File extensions offered by the open and save dialogs
+const SOURCE_EXTENSIONS: &[&str] = &["txt", "twb", "twp", "tpr"];
+
+/// Keywords highlighted by the editor preview, including the turtle graphics commands
+const EDITOR_KEYWORDS: &[&str] = &[
+    "PRINT",
+    "WRITELN",
+    "INPUT",
+    "READLN",
+    "LET",
+    "IF",
+    "THEN",
+    "ELSE",
+    "END",
+    "STOP",
+    "FOR",
+    "TO",
+    "STEP",
+    "NEXT",
+    "WHILE",
+    "WEND",
+    "GOTO",
+    "GOSUB",
+    "RETURN",
+    "REM",
+    "CLS",
+    "COLOR",
+    "LOCATE",
+    "BEEP",
+    "SLEEP",
+    "RANDOMIZE",
+    "DIM",
+    "DATA",
+    "READ",
+    "RESTORE",
+    "FORWARD",
+    "FD",
+    "BACK",
+    "BK",
+    "LEFT",
+    "LT",
+    "RIGHT",
+    "RT",
+    "PENUP",
+    "PU",
+    "PENDOWN",
+    "PD",
+    "AND",
+    "OR",
+    "NOT",
+    "SIN",
+    "COS",
+    "TAN",
+    "SQR",
+    "ABS",
+    "INT",
+    "LOG",
+    "EXP",
+    "ATN",
+    "RND",
+];
+
+/// TW BASIC keywords used for code completion and debug view highlighting
+const LANGUAGE_KEYWORDS: &[&str] = &[
+    "PRINT",
+    "INPUT",
+    "LET",
+    "IF",
+    "THEN",
+    "ELSE",
+    "FOR",
+    "TO",
+    "STEP",
+    "NEXT",
+    "WHILE",
+    "WEND",
+    "GOTO",
+    "GOSUB",
+    "RETURN",
+    "END",
+    "CLS",
+    "LOCATE",
+    "COLOR",
+    "BEEP",
+    "SLEEP",
+    "RANDOMIZE",
+    "RND",
+    "INT",
+    "STR$",
+    "VAL",
+    "LEN",
+    "LEFT$",
+    "RIGHT$",
+    "MID$",
+    "CHR$",
+    "ASC",
+    "ABS",
+    "SIN",
+    "COS",
+    "TAN",
+    "LOG",
+    "EXP",
+    "SQR",
+    "AND",
+    "OR",
+    "NOT",
+    "MOD",
+    "DIM",
+    "READ",
+    "DATA",
+    "RESTORE",
+    "DEF",
+    "FN",
+    "REM",
+];
+
 #[derive(Clone)]
 struct TurtleState {
     x: f32,
@@ -29,7 +145,7 @@ struct TimeWarpApp {
     replace_text: String,
     show_find_replace: bool,
     turtle_state: TurtleState,
-    turtle_commands: Vec<String>,
+    turtle_lines: Vec<(egui::Pos2, egui::Pos2)>, // Line segments in turtle coordinates
     variables: HashMap<String, String>,
     is_executing: bool,
     waiting_for_input: bool,
@@ -110,7 +226,7 @@ impl Default for TimeWarpApp {
                 angle: 0.0,
                 color: egui::Color32::BLACK,
             },
-            turtle_commands: Vec::new(),
+            turtle_lines: Vec::new(),
             variables: HashMap::new(),
             is_executing: false,
             waiting_for_input: false,
@@ -233,65 +349,6 @@ impl TimeWarpApp {
     }
 
     fn render_syntax_highlighted_text(&self, ui: &mut egui::Ui, text: &str) {
-        // Basic syntax highlighting for BASIC keywords
-        let keywords = [
-            "PRINT",
-            "WRITELN",
-            "INPUT",
-            "READLN",
-            "LET",
-            "IF",
-            "THEN",
-            "ELSE",
-            "END",
-            "STOP",
-            "FOR",
-            "TO",
-            "STEP",
-            "NEXT",
-            "WHILE",
-            "WEND",
-            "GOTO",
-            "GOSUB",
-            "RETURN",
-            "REM",
-            "CLS",
-            "COLOR",
-            "LOCATE",
-            "BEEP",
-            "SLEEP",
-            "RANDOMIZE",
-            "DIM",
-            "DATA",
-            "READ",
-            "RESTORE",
-            "FORWARD",
-            "FD",
-            "BACK",
-            "BK",
-            "LEFT",
-            "LT",
-            "RIGHT",
-            "RT",
-            "PENUP",
-            "PU",
-            "PENDOWN",
-            "PD",
-            "AND",
-            "OR",
-            "NOT",
-            "SIN",
-            "COS",
-            "TAN",
-            "SQR",
-            "ABS",
-            "INT",
-            "LOG",
-            "EXP",
-            "ATN",
-            "RND",
-        ];
-
         let lines: Vec<&str> = text.lines().collect();
 
         for (line_num, line) in lines.iter().enumerate() {
@@ -311,11 +368,8 @@ impl TimeWarpApp {
                     let mut found_keyword = false;
 
                     // Check for keywords at start of remaining text
-                    for keyword in &keywords {
-                        if remaining
-                            .to_uppercase()
-                            .starts_with(&keyword.to_uppercase())
-                        {
+                    for keyword in EDITOR_KEYWORDS {
+                        if Self::starts_with_keyword(remaining, keyword) {
                             let keyword_len = keyword.len();
                             if remaining.len() == keyword_len
                                 || !remaining
@@ -381,6 +435,39 @@ impl TimeWarpApp {
         }
     }
 
+    /// Install the IDE's visuals and text styles. The theme never changes at runtime,
+    /// so this runs once at startup rather than rebuilding the style every frame.
+    fn apply_theme(ctx: &egui::Context) {
+        // Enhanced visual styling
+        let mut visuals = egui::Visuals::light();
+        visuals.window_fill = egui::Color32::from_rgb(250, 250, 252);
+        visuals.panel_fill = egui::Color32::from_rgb(255, 255, 255);
+        visuals.faint_bg_color = egui::Color32::from_rgb(248, 248, 250);
+        visuals.widgets.noninteractive.bg_fill = egui::Color32::from_rgb(252, 252, 254);
+        visuals.widgets.inactive.bg_fill = egui::Color32::from_rgb(255, 255, 255);
+        visuals.widgets.hovered.bg_fill = egui::Color32::from_rgb(240, 245, 255);
+        visuals.widgets.active.bg_fill = egui::Color32::from_rgb(230, 240, 255);
+        ctx.set_visuals(visuals);
+
+        // Set a more modern font
+        let mut style = (*ctx.style()).clone();
+        style.text_styles.insert(
+            egui::TextStyle::Heading,
+            egui::FontId::new(20.0, egui::FontFamily::Proportional),
+        );
+        style.text_styles.insert(
+            egui::TextStyle::Body,
+            egui::FontId::new(14.0, egui::FontFamily::Proportional),
+        );
+        style.text_styles.insert(
+            egui::TextStyle::Button,
+            egui::FontId::new(14.0, egui::FontFamily::Proportional),
+        );
+        style.spacing.item_spacing = egui::vec2(8.0, 4.0);
+        style.spacing.button_padding = egui::vec2(8.0, 4.0);
+        ctx.set_style(style);
+    }
+
     fn execute_code(&mut self) {
         self.active_tab = 1; // Switch to Output tab when running
         self.is_executing = true;
@@ -405,8 +492,9 @@ impl TimeWarpApp {
     fn execute_tw_basic(&mut self, code: &str) -> String {
         use crate::languages::basic::Interpreter;
 
-        // Convert line-numbered BASIC to statements without line numbers
-        let mut statements = Vec::new();
+        // Convert line-numbered BASIC to statements without line numbers, joining them
+        // with colons (BASIC statement separator) in a single pass over the source
+        let mut program_code = String::with_capacity(code.len());
         for line in code.lines() {
             let line = line.trim();
             if line.is_empty() {
@@ -414,20 +502,19 @@ impl TimeWarpApp {
             }
 
             // Try to parse line number and extract the statement
-            if let Some((line_num_str, command)) = line.split_once(' ') {
-                if line_num_str.parse::<u32>().is_ok() {
-                    statements.push(command.trim().to_string());
-                } else {
-                    statements.push(line.to_string());
+            let statement = match line.split_once(' ') {
+                Some((line_num_str, command)) if line_num_str.parse::<u32>().is_ok() => {
+                    command.trim()
                 }
-            } else {
-                statements.push(line.to_string());
+                _ => line,
+            };
+
+            if !program_code.is_empty() {
+                program_code.push_str(" : ");
             }
+            program_code.push_str(statement);
         }
 
-        // Join statements with colons for the interpreter (BASIC statement separator)
-        let program_code = statements.join(" : ");
-
         let mut interpreter = Interpreter::new();
         // Set execution timeout based on instruction limit
         // Rough estimate: 1000 instructions per second
@@ -478,9 +565,9 @@ impl TimeWarpApp {
 
         if draw {
             // Store the line for rendering
-            self.turtle_commands.push(format!(
-                "LINE {} {} {} {}",
-                self.turtle_state.x, self.turtle_state.y, new_x, new_y
+            self.turtle_lines.push((
+                egui::pos2(self.turtle_state.x, self.turtle_state.y),
+                egui::pos2(new_x, new_y),
             ));
         }
 
@@ -489,12 +576,14 @@ impl TimeWarpApp {
     }
 
     fn process_graphics_commands(&mut self, commands: &[crate::languages::basic::GraphicsCommand]) {
+        use crate::languages::basic::GraphicsOp;
+
         for cmd in commands {
-            match cmd.command.as_str() {
-                "FORWARD" => {
+            match cmd.command {
+                GraphicsOp::Forward => {
                     self.move_turtle(cmd.value, true);
                 }
-                "RIGHT" => {
+                GraphicsOp::Right => {
                     self.turtle_state.angle = (self.turtle_state.angle + cmd.value) % 360.0;
                 }
                 _ => {
@@ -574,12 +663,8 @@ impl TimeWarpApp {
 
         let syntax_enabled = self.syntax_highlighting_enabled;
         let current_debug_line = self.current_debug_line;
-        let language = "TW BASIC".to_string();
-        let keywords: Vec<String> = self
-            .get_language_keywords()
-            .into_iter()
-            .map(|s| s.to_string())
-            .collect();
+        let language = "TW BASIC";
+        let keywords = self.get_language_keywords();
 
         egui::ScrollArea::vertical().show(ui, |ui| {
             ui.set_width(ui.available_width());
@@ -635,7 +720,7 @@ impl TimeWarpApp {
                     // Line content with syntax highlighting
                     if syntax_enabled {
                         // Simple syntax highlighting for debug view
-                        let highlighted = Self::highlight_line_static(&line, &keywords, &language);
+                        let highlighted = Self::highlight_line_static(line, keywords, language);
                         for (text, color) in highlighted {
                             ui.label(
                                 egui::RichText::new(text)
@@ -690,7 +775,7 @@ impl TimeWarpApp {
 
     fn highlight_line_static(
         line: &str,
-        keywords: &[String],
+        keywords: &[&str],
         language: &str,
     ) -> Vec<(String, egui::Color32)> {
         if line.trim().is_empty() {
@@ -701,10 +786,6 @@ impl TimeWarpApp {
         let chars: Vec<char> = line.chars().collect();
         let mut i = 0;
 
-        // Create keyword set from provided keywords
-        let keyword_set: std::collections::HashSet<String> =
-            keywords.iter().map(|k| k.to_uppercase()).collect();
-
         while i < chars.len() {
             // Check for comments first
             if Self::is_comment_start_static(&line[i..], language) {
@@ -785,74 +866,9 @@ impl TimeWarpApp {
 
             // Check for keywords
             let remaining = &line[i..];
-            let mut _found_keyword = false;
-            for keyword in &keyword_set {
-                if remaining.to_uppercase().starts_with(keyword) {
-                    let keyword_len = keyword.len();
-                    let next_char = if i + keyword_len < chars.len() {
-                        chars[i + keyword_len]
-                    } else {
-                        ' '
-                    };
-
-                    if next_char.is_whitespace()
-                        || next_char == '('
-                        || next_char == ')'
-                        || next_char == ','
-                        || next_char == ';'
-                        || next_char == ':'
-                    {
-                        if i > 0 {
-                            highlighted.push((line[..i].to_string(), egui::Color32::BLACK));
-                        }
-                        highlighted.push((
-                            line[i..i + keyword_len].to_string(),
-                            egui::Color32::from_rgb(0, 0, 255),
-                        ));
-                        i += keyword_len;
-                        _found_keyword = true;
-                        break;
-                    }
-                }
-            }
-
-            // Check for operators
-            if "+-*/=<>!&|^%".contains(chars[i]) {
-                let mut end = i + 1;
-                // Handle compound operators like ==, !=, <=, >=, +=, etc.
-                if end < chars.len() && "+-*/=<>!&|^%".contains(chars[end]) {
-                    end += 1;
-                }
-
-                if i > 0 {
-                    highlighted.push((line[..i].to_string(), egui::Color32::BLACK));
-                }
-                highlighted.push((
-                    line[i..end].to_string(),
-                    egui::Color32::from_rgb(128, 64, 0),
-                )); // Orange-brown for operators
-                i = end;
-                continue;
-            }
-
-            // Check for brackets and parentheses
-            if "(){}[]".contains(chars[i]) {
-                if i > 0 {
-                    highlighted.push((line[..i].to_string(), egui::Color32::BLACK));
-                }
-                highlighted.push((
-                    line[i..i + 1].to_string(),
-                    egui::Color32::from_rgb(128, 0, 128),
-                )); // Purple for brackets
-                i += 1;
-                continue;
-            }
-
-            // Check for keywords
-            let remaining = &line[i..];
-            let mut _found_keyword = false;
-            for keyword in &keyword_set {
-                if remaining.to_uppercase().starts_with(keyword) {
+            let mut found_keyword = false;
+            for keyword in keywords {
+                if Self::starts_with_keyword(remaining, keyword) {
                     let keyword_len = keyword.len();
                     let next_char = if i + keyword_len < chars.len() {
                         chars[i + keyword_len]
@@ -875,13 +891,13 @@ impl TimeWarpApp {
                             egui::Color32::from_rgb(0, 0, 255),
                         ));
                         i += keyword_len;
-                        _found_keyword = true;
+                        found_keyword = true;
                         break;
                     }
                 }
             }
 
-            if !_found_keyword {
+            if !found_keyword {
                 i += 1;
             }
         }
@@ -893,6 +909,13 @@ impl TimeWarpApp {
         highlighted
     }
 
+    /// Case-insensitive match of an ASCII keyword at the start of `text`, compared in
+    /// place instead of uppercasing the rest of the line for every keyword
+    fn starts_with_keyword(text: &str, keyword: &str) -> bool {
+        text.get(..keyword.len())
+            .is_some_and(|prefix| prefix.eq_ignore_ascii_case(keyword))
+    }
+
     fn is_comment_start_static(text: &str, language: &str) -> bool {
         match language {
             "TW BASIC" => text.starts_with("REM ") || text.starts_with("'"),
@@ -901,59 +924,8 @@ impl TimeWarpApp {
     }
 
     // Code completion methods
-    fn get_language_keywords(&self) -> Vec<&'static str> {
-        vec![
-            "PRINT",
-            "INPUT",
-            "LET",
-            "IF",
-            "THEN",
-            "ELSE",
-            "FOR",
-            "TO",
-            "STEP",
-            "NEXT",
-            "WHILE",
-            "WEND",
-            "GOTO",
-            "GOSUB",
-            "RETURN",
-            "END",
-            "CLS",
-            "LOCATE",
-            "COLOR",
-            "BEEP",
-            "SLEEP",
-            "RANDOMIZE",
-            "RND",
-            "INT",
-            "STR$",
-            "VAL",
-            "LEN",
-            "LEFT$",
-            "RIGHT$",
-            "MID$",
-            "CHR$",
-            "ASC",
-            "ABS",
-            "SIN",
-            "COS",
-            "TAN",
-            "LOG",
-            "EXP",
-            "SQR",
-            "AND",
-            "OR",
-            "NOT",
-            "MOD",
-            "DIM",
-            "READ",
-            "DATA",
-            "RESTORE",
-            "DEF",
-            "FN",
-            "REM",
-        ]
+    fn get_language_keywords(&self) -> &'static [&'static str] {
+        LANGUAGE_KEYWORDS
     }
 
     fn get_completion_suggestions(&self, query: &str) -> Vec<String> {
@@ -1149,35 +1121,6 @@ impl TimeWarpApp {
 
 impl eframe::App for TimeWarpApp {
     fn update(&mut self, ctx: &egui::Context, _frame: &mut eframe::Frame) {
-        // Enhanced visual styling
-        let mut visuals = egui::Visuals::light();
-        visuals.window_fill = egui::Color32::from_rgb(250, 250, 252);
-        visuals.panel_fill = egui::Color32::from_rgb(255, 255, 255);
-        visuals.faint_bg_color = egui::Color32::from_rgb(248, 248, 250);
-        visuals.widgets.noninteractive.bg_fill = egui::Color32::from_rgb(252, 252, 254);
-        visuals.widgets.inactive.bg_fill = egui::Color32::from_rgb(255, 255, 255);
-        visuals.widgets.hovered.bg_fill = egui::Color32::from_rgb(240, 245, 255);
-        visuals.widgets.active.bg_fill = egui::Color32::from_rgb(230, 240, 255);
-        ctx.set_visuals(visuals);
-
-        // Set a more modern font
-        let mut style = (*ctx.style()).clone();
-        style.text_styles.insert(
-            egui::TextStyle::Heading,
-            egui::FontId::new(20.0, egui::FontFamily::Proportional),
-        );
-        style.text_styles.insert(
-            egui::TextStyle::Body,
-            egui::FontId::new(14.0, egui::FontFamily::Proportional),
-        );
-        style.text_styles.insert(
-            egui::TextStyle::Button,
-            egui::FontId::new(14.0, egui::FontFamily::Proportional),
-        );
-        style.spacing.item_spacing = egui::vec2(8.0, 4.0);
-        style.spacing.button_padding = egui::vec2(8.0, 4.0);
-        ctx.set_style(style);
-
         // Handle keyboard shortcuts
         if ctx.input(|i| i.modifiers.ctrl && i.key_pressed(egui::Key::N)) {
             self.code.clear();
@@ -1185,7 +1128,7 @@ impl eframe::App for TimeWarpApp {
         }
         if ctx.input(|i| i.modifiers.ctrl && i.key_pressed(egui::Key::O)) {
             if let Some(path) = FileDialog::new()
-                .add_filter("Text", &["txt", "twb", "twp", "tpr"])
+                .add_filter("Text", SOURCE_EXTENSIONS)
                 .pick_file()
             {
                 if let Ok(content) = std::fs::read_to_string(&path) {
@@ -1243,7 +1186,7 @@ impl eframe::App for TimeWarpApp {
         }
         if ctx.input(|i| i.modifiers.ctrl && i.modifiers.shift && i.key_pressed(egui::Key::C)) {
             self.output = String::new();
-            self.turtle_commands.clear();
+            self.turtle_lines.clear();
             self.turtle_state = TurtleState {
                 x: 0.0,
                 y: 0.0,
@@ -1273,7 +1216,7 @@ impl eframe::App for TimeWarpApp {
                         }
                         if ui.button("📂 Open File...").clicked() {
                             if let Some(path) = FileDialog::new()
-                                .add_filter("Text", &["txt", "twb", "twp", "tpr"])
+                                .add_filter("Text", SOURCE_EXTENSIONS)
                                 .pick_file()
                             {
                                 if let Ok(content) = std::fs::read_to_string(&path) {
@@ -1418,7 +1361,7 @@ impl eframe::App for TimeWarpApp {
                             .clicked()
                         {
                             if let Some(path) = FileDialog::new()
-                                .add_filter("Text", &["txt", "twb", "twp", "tpr"])
+                                .add_filter("Text", SOURCE_EXTENSIONS)
                                 .pick_file()
                             {
                                 if let Ok(content) = std::fs::read_to_string(&path) {
@@ -1486,7 +1429,7 @@ impl eframe::App for TimeWarpApp {
                             .clicked()
                         {
                             self.output = String::new();
-                            self.turtle_commands.clear();
+                            self.turtle_lines.clear();
                             self.turtle_state = TurtleState {
                                 x: 0.0,
                                 y: 0.0,
@@ -1895,62 +1838,48 @@ impl eframe::App for TimeWarpApp {
                                         self.turtle_pan += response.drag_delta() / self.turtle_zoom;
                                     }
 
-                                    ui.painter().rect_filled(rect, 0.0, egui::Color32::WHITE);
-                                    ui.painter().rect_stroke(
+                                    // Look the painter up once and reuse it for every shape below
+                                    let painter = ui.painter();
+                                    painter.rect_filled(rect, 0.0, egui::Color32::WHITE);
+                                    painter.rect_stroke(
                                         rect,
                                         0.0,
                                         egui::Stroke::new(1.0, egui::Color32::BLACK),
                                     );
 
-                                    // Draw turtle lines with zoom and pan
-                                    for command in &self.turtle_commands {
-                                        if command.starts_with("LINE ") {
-                                            let parts: Vec<&str> =
-                                                command.split_whitespace().collect();
-                                            if parts.len() >= 5 {
-                                                if let (Ok(x1), Ok(y1), Ok(x2), Ok(y2)) = (
-                                                    parts[1].parse::<f32>(),
-                                                    parts[2].parse::<f32>(),
-                                                    parts[3].parse::<f32>(),
-                                                    parts[4].parse::<f32>(),
-                                                ) {
-                                                    let center = rect.center();
-                                                    let start = egui::pos2(
-                                                        center.x
-                                                            + (x1 + self.turtle_pan.x)
-                                                                * self.turtle_zoom,
-                                                        center.y
-                                                            + (y1 + self.turtle_pan.y)
-                                                                * self.turtle_zoom,
-                                                    );
-                                                    let end = egui::pos2(
-                                                        center.x
-                                                            + (x2 + self.turtle_pan.x)
-                                                                * self.turtle_zoom,
-                                                        center.y
-                                                            + (y2 + self.turtle_pan.y)
-                                                                * self.turtle_zoom,
-                                                    );
-                                                    ui.painter().line_segment(
-                                                        [start, end],
-                                                        egui::Stroke::new(
-                                                            2.0,
-                                                            egui::Color32::BLACK,
-                                                        ),
-                                                    );
-                                                }
+                                    // Draw turtle lines with zoom and pan. Segments that continue
+                                    // from the previous end point are joined into one polyline
+                                    // shape instead of being painted one by one
+                                    let center = rect.center();
+                                    let to_screen = |point: egui::Pos2| {
+                                        center + (point.to_vec2() + self.turtle_pan) * self.turtle_zoom
+                                    };
+                                    let stroke = egui::Stroke::new(2.0, egui::Color32::BLACK);
+                                    let mut path: Vec<egui::Pos2> = Vec::new();
+                                    for &(line_start, line_end) in &self.turtle_lines {
+                                        let start = to_screen(line_start);
+                                        if path.last() != Some(&start) {
+                                            if path.len() >= 2 {
+                                                painter.add(egui::Shape::line(
+                                                    std::mem::take(&mut path),
+                                                    stroke,
+                                                ));
                                             }
+                                            path.clear();
+                                            path.push(start);
                                         }
+                                        path.push(to_screen(line_end));
+                                    }
+                                    if path.len() >= 2 {
+                                        painter.add(egui::Shape::line(path, stroke));
                                     }
 
                                     // Draw turtle
-                                    let center = rect.center();
-                                    let turtle_x = center.x
-                                        + (self.turtle_state.x + self.turtle_pan.x)
-                                            * self.turtle_zoom;
-                                    let turtle_y = center.y
-                                        + (self.turtle_state.y + self.turtle_pan.y)
-                                            * self.turtle_zoom;
+                                    let turtle_pos = to_screen(egui::pos2(
+                                        self.turtle_state.x,
+                                        self.turtle_state.y,
+                                    ));
+                                    let (turtle_x, turtle_y) = (turtle_pos.x, turtle_pos.y);
 
                                     // Draw a simple triangle for the turtle
                                     let size = 8.0 * self.turtle_zoom;
@@ -1970,7 +1899,7 @@ impl eframe::App for TimeWarpApp {
                                         ),
                                     ];
 
-                                    ui.painter().add(egui::Shape::convex_polygon(
+                                    painter.add(egui::Shape::convex_polygon(
                                         points.to_vec(),
                                         self.turtle_state.color,
                                         egui::Stroke::new(1.0, egui::Color32::BLACK),
@@ -2307,13 +2236,18 @@ fn main() -> eframe::Result<()> {
         viewport: egui::ViewportBuilder::default()
             .with_inner_size([1200.0, 800.0])
             .with_title("Time Warp IDE"),
+        // The theme is applied once at startup, so don't let system theme changes replace it
+        follow_system_theme: false,
         ..Default::default()
     };
 
     eframe::run_native(
         "Time Warp IDE",
         options,
-        Box::new(|_cc| Box::new(TimeWarpApp::default())),
+        Box::new(|cc| {
+            TimeWarpApp::apply_theme(&cc.egui_ctx);
+            Box::new(TimeWarpApp::default())
+        }),
     )
 }
 
@@ -2625,6 +2559,84 @@ mod tests {
         assert_eq!(program.statements.len(), 1);
     }
 
+    #[test]
+    fn test_parse_constant_folding() {
+        use crate::languages::basic::{Expression, Parser, Statement, Tokenizer};
+
+        let mut tokenizer = Tokenizer::new("LET X = (1 + 2) * -4 / 2");
+        let tokens = tokenizer.tokenize().unwrap();
+        let mut parser = Parser::new(tokens);
+        let program = parser.parse_program().unwrap();
+
+        // Constant arithmetic should be folded into a single literal at parse time
+        match &program.statements[0] {
+            Statement::Let { expression, .. } => {
+                assert_eq!(*expression, Expression::Number(-6.0));
+            }
+            other => panic!("Expected LET statement, got {:?}", other),
+        }
+
+        // Division by zero is not folded so the runtime error is preserved
+        let mut tokenizer = Tokenizer::new("PRINT 1 / 0");
+        let tokens = tokenizer.tokenize().unwrap();
+        let mut parser = Parser::new(tokens);
+        let program = parser.parse_program().unwrap();
+        match &program.statements[0] {
+            Statement::Print { expressions, .. } => {
+                assert!(matches!(expressions[0], Expression::BinaryOp { .. }));
+            }
+            other => panic!("Expected PRINT statement, got {:?}", other),
+        }
+    }
+
+    #[test]
+    fn test_goto_gosub_line_numbers() {
+        use crate::languages::basic::{ExecutionResult, Interpreter};
+
+        // GOTO targets are BASIC line numbers, not statement positions
+        let mut interpreter = Interpreter::new();
+        let result =
+            interpreter.execute("10 PRINT \"A\"\n20 GOTO 40\n30 PRINT \"B\"\n40 PRINT \"C\"");
+        match result {
+            Ok(ExecutionResult::Complete { output, .. }) => {
+                assert!(output.contains('A'));
+                assert!(!output.contains('B'));
+                assert!(output.contains('C'));
+            }
+            other => panic!("Expected completed program, got {:?}", other),
+        }
+
+        // GOSUB jumps to the numbered line and RETURN resumes after the call
+        let mut interpreter = Interpreter::new();
+        let result = interpreter
+            .execute("10 GOSUB 100\n20 PRINT \"BACK\"\n30 END\n100 PRINT \"SUB\"\n110 RETURN");
+        match result {
+            Ok(ExecutionResult::Complete { output, .. }) => {
+                let sub = output.find("SUB").expect("subroutine did not run");
+                let back = output.find("BACK").expect("did not return from subroutine");
+                assert!(sub < back);
+            }
+            other => panic!("Expected completed program, got {:?}", other),
+        }
+    }
+
+    #[test]
+    fn test_lowercase_identifiers() {
+        use crate::languages::basic::{ExecutionResult, Interpreter};
+
+        // Keywords, variables and function names are case-insensitive
+        let mut interpreter = Interpreter::new();
+        let result = interpreter
+            .execute("def fn sq(n) = n * n : let x = int(7.5) : print X : print fnsq(3)");
+        match result {
+            Ok(ExecutionResult::Complete { output, .. }) => {
+                assert!(output.contains('7'));
+                assert!(output.contains('9'));
+            }
+            other => panic!("Expected completed program, got {:?}", other),
+        }
+    }
+
     #[test]
     fn test_print_with_line_number() {
         let mut app = TimeWarpApp::default();
@@ -2874,13 +2886,16 @@ mod tests {
         let code = "10 FORWARD 5\n20 END";
         let result = app.execute_tw_basic(code);
         println!("FORWARD test result: {:?}", result);
-        println!("Turtle commands after FORWARD: {:?}", app.turtle_commands);
+        println!("Turtle lines after FORWARD: {:?}", app.turtle_lines);
         println!(
             "Turtle state: x={}, y={}, angle={}",
             app.turtle_state.x, app.turtle_state.y, app.turtle_state.angle
         );
         assert!(result.contains("Moved forward"));
-        assert!(!app.turtle_commands.is_empty());
+        assert_eq!(
+            app.turtle_lines,
+            vec![(egui::pos2(0.0, 0.0), egui::pos2(5.0, 0.0))]
+        );
         // Should have moved 5 units from (0, 0) to (5, 0)
         assert_eq!(app.turtle_state.x, 5.0);
         assert_eq!(app.turtle_state.y, 0.0);
@@ -2894,21 +2909,44 @@ mod tests {
         let code = "FORWARD 50";
         let result = app.execute_tw_basic(code);
         println!("Direct FORWARD test result: {:?}", result);
-        println!(
-            "Turtle commands after direct FORWARD: {:?}",
-            app.turtle_commands
-        );
+        println!("Turtle lines after direct FORWARD: {:?}", app.turtle_lines);
         println!(
             "Turtle state: x={}, y={}, angle={}",
             app.turtle_state.x, app.turtle_state.y, app.turtle_state.angle
         );
         assert!(result.contains("Moved forward"));
-        assert!(!app.turtle_commands.is_empty());
+        assert!(!app.turtle_lines.is_empty());
         // Should have moved 50 units from (0, 0) to (50, 0)
         assert_eq!(app.turtle_state.x, 50.0);
         assert_eq!(app.turtle_state.y, 0.0);
     }
 
+    #[test]
+    fn test_highlight_keyword_at_end_of_line() {
+        let keywords = ["END", "PRINT"];
+
+        // A keyword that ends the line must not read past the last character
+        let highlighted = TimeWarpApp::highlight_line_static("END", &keywords, "TW BASIC");
+        assert_eq!(
+            highlighted,
+            vec![("END".to_string(), egui::Color32::from_rgb(0, 0, 255))]
+        );
+
+        let highlighted = TimeWarpApp::highlight_line_static("PRINT(1)", &keywords, "TW BASIC");
+        assert_eq!(highlighted[0].0, "PRINT");
+        assert!(highlighted.iter().any(|(text, _)| text == "("));
+    }
+
+    #[test]
+    fn test_starts_with_keyword() {
+        assert!(TimeWarpApp::starts_with_keyword("print x", "PRINT"));
+        assert!(TimeWarpApp::starts_with_keyword("Goto 10", "GOTO"));
+        assert!(!TimeWarpApp::starts_with_keyword("PRIN", "PRINT"));
+        assert!(!TimeWarpApp::starts_with_keyword("LET X", "PRINT"));
+        // Non-ASCII text never matches and must not be sliced mid-character
+        assert!(!TimeWarpApp::starts_with_keyword("ſin(1)", "SIN"));
+    }
+
     // ===== GW BASIC COMMAND TESTS =====
 
     #[test]